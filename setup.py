@@ -4,6 +4,7 @@ setup(
     name="video_creator",
     version="0.1.0",
     packages=find_packages(),
+    python_requires=">=3.10",
     install_requires=[
         "fastapi",
         "uvicorn",
@@ -1,4 +1,6 @@
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 from pathlib import Path
 import sys
 from typing import List
@@ -14,6 +16,7 @@ from src.models.models import ProjectDetails, Script, RegenerateImageRequest
 from src.services.aws_service import AWSService
 from src.services.background_music_service import BackgroundMusicService
 from src.services.video_service_factory import VideoServiceFactory, VideoProvider
+from src.services.video_service_base import detect_video_encoder
 from src.services.face_detection_service import FaceDetectionService
 
 import os
@@ -40,7 +43,18 @@ logging.getLogger("urllib3").setLevel(logging.WARNING)
 # Get the logger for this module
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Video Creator API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Prepare shared resources at startup and release them at shutdown"""
+    # Probe for a hardware video encoder once, off the event loop, before any render needs it
+    await asyncio.to_thread(detect_video_encoder)
+    yield
+    # Close the keep-alive download sessions held by cached video services
+    await VideoServiceFactory.close_instances()
+    # Close the PlayHT client and HTTP session held by the voice service
+    VoiceService.close_instance()
+
+app = FastAPI(title="Video Creator API", lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -403,19 +417,8 @@ async def generate_narration(project_name: str, request: NarrationRequest):
         aws_service = AWSService(project_name=project_name)
         voice_service = VoiceService.get_instance()
 
-        # Get or create cloned voice using the voice sample
-        voice_sample_path = f"temp/{project_name}/voice_sample.m4a"
-        if os.path.exists(voice_sample_path):
-            try:
-                voice_id = voice_service.get_or_create_cloned_voice(
-                    voice_sample_path=voice_sample_path,
-                    voice_name=f"{project_name}"
-                )
-            except Exception as e:
-                logger.error(f"Error creating cloned voice: {str(e)}")
-                voice_id = None
-        else:
-            voice_id = None
+        # Get or create cloned voice using the voice sample, off the event loop
+        voice_id = await voice_service.resolve_project_voice(project_name)
 
         # Generate a unique filename for this narration
         audio_path = f"chapter_{request.chapter_number}/scene_{request.scene_number}/narration.wav"
@@ -430,10 +433,8 @@ async def generate_narration(project_name: str, request: NarrationRequest):
             voice_id=voice_id or request.voice_id
         )
 
-        # Write chunks to file
-        with open(local_path, "wb") as audio_file:
-            for chunk in audio_chunks:
-                audio_file.write(chunk)
+        # Write chunks to file on a worker thread so the streaming TTS response doesn't block the loop
+        await asyncio.to_thread(voice_service.save_audio, audio_chunks, local_path)
 
         return get_audio_file_response(local_path)
 
@@ -606,10 +607,11 @@ async def generate_shot_video(project_name: str, request: VideoGenerationRequest
             if request.black_and_white:
                 original_path = Path(video_path)
                 bw_path = original_path.parent / f"{original_path.stem}_bw{original_path.suffix}"
-                if video_service._apply_black_and_white(original_path, bw_path):
+                if await video_service._apply_black_and_white(original_path, bw_path):
                     video_path = str(bw_path)
                     # Remove the original color video
                     original_path.unlink(missing_ok=True)
+                    video_service.invalidate_dir_listing(original_path.parent)
                 else:
                     logger.warning("Failed to apply black and white filter, using original video")
 
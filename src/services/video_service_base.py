@@ -1,114 +1,454 @@
 from pathlib import Path
+import asyncio
 import logging
-import base64
+import mmap
 import os
+import shutil
 import subprocess
-from typing import Dict, Tuple, Union, List
+import tempfile
+import time
+import wave
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, Tuple, Union, List
 from abc import ABC, abstractmethod
 from pydantic import BaseModel
+import aiohttp
 
 from src.services.aws_service import AWSService
 
+try:
+    # SIMD-accelerated drop-in replacement for the stdlib encoder
+    from pybase64 import b64encode
+except ImportError:
+    from base64 import b64encode
+
+try:
+    # Optional: reads container durations in-process instead of spawning ffprobe
+    import av
+except ImportError:
+    av = None
+
 logger = logging.getLogger(__name__)
 
+# Images are base64-encoded in chunks that are a multiple of 3 bytes so no padding is emitted mid-stream
+ENCODE_CHUNK_SIZE = 48 * 1024
+# Images at least this large are memory-mapped instead of copied through read()
+MMAP_MIN_SIZE = 64 * 1024
+
+# Upper bound on threads used to encode a list of shot images
+IMAGE_ENCODE_WORKERS = 8
+
+# Finished shot videos are tens of MB, so downloads are read and written in 1 MiB chunks
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+
+# How long (seconds) a scene directory listing is reused by video_exists. Writes and deletes made
+# through this service drop the listing right away; the TTL only bounds staleness from other writers.
+SCENE_DIR_CACHE_TTL = 2.0
+
+# Intermediate ffmpeg files are written to RAM-backed storage when available
+SCRATCH_ROOT = os.environ.get(
+    "VIDEO_SCRATCH",
+    "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+)
+# Share of SCRATCH_ROOT's free space a render may claim before its files go to the disk temp dir
+# instead (Docker gives /dev/shm only 64 MB by default)
+SCRATCH_MAX_FILL = 0.5
+
+# ffmpeg filter templates shared by the scene and combine pipelines.
+# Frames are dropped before scaling so high-fps sources aren't scaled needlessly.
+NORMALIZE_FILTERS = (
+    "fps=30,"
+    "scale=1280:768:force_original_aspect_ratio=decrease:force_divisible_by=2,"
+    "pad=1280:768:(ow-iw)/2:(oh-ih)/2,"
+    "setsar=1"
+)
+FADE_FILTERS = "fade=t=in:st=0:d=1,fade=t=out:st={fade_out_start}:d=1"
+NARRATION_FORMAT_FILTER = "[{source}]aformat=sample_fmts=fltp:sample_rates=44100[n]"
+MUSIC_FILTER = (
+    "[{source}]aformat=sample_fmts=fltp:sample_rates=44100,volume=0.1,"
+    "afade=t=in:st=0:d=2,"
+    "afade=t=out:st={fade_out_start}:d=1.5[m]"
+)
+AUDIO_MIX_FILTER = "[n][m]amix=inputs=2:duration=longest:weights=1 0.8[a]"
+
+# Only the end of ffmpeg's stderr is kept for error reporting; the rest stays on disk
+FFMPEG_STDERR_TAIL = 8192
+
+def _read_stderr_tail(stderr_file) -> bytes:
+    """Return the last FFMPEG_STDERR_TAIL bytes written to an ffmpeg stderr file"""
+    size = stderr_file.seek(0, os.SEEK_END)
+    stderr_file.seek(max(0, size - FFMPEG_STDERR_TAIL))
+    return stderr_file.read()
+
+def _stderr_tail_text(error: subprocess.CalledProcessError) -> str:
+    """Decode at most the last FFMPEG_STDERR_TAIL bytes of a failed command's stderr for logging"""
+    return (error.stderr or b"")[-FFMPEG_STDERR_TAIL:].decode("utf-8", "replace")
+
+# Hardware H.264 encoders tried in order before falling back to libx264.
+# VIDEO_ENCODER overrides detection (e.g. VIDEO_ENCODER=libx264 to force software encoding).
+HW_ENCODER_CANDIDATES = ("h264_nvenc", "h264_qsv", "h264_vaapi")
+# Encoders _video_codec_args knows how to configure
+SUPPORTED_ENCODERS = ("libx264", *HW_ENCODER_CANDIDATES)
+
+# Render node used by h264_vaapi (Intel/AMD GPUs on Linux)
+VAAPI_DEVICE = os.environ.get("VAAPI_DEVICE", "/dev/dri/renderD128")
+
+def _encoder_device_args(encoder: str) -> List[str]:
+    """Global ffmpeg options an encoder needs before the inputs"""
+    if encoder == "h264_vaapi":
+        return ["-vaapi_device", VAAPI_DEVICE]
+    return []
+
+def _encoder_upload_filter(encoder: str) -> str:
+    """Filters appended to a video chain to hand software frames to the encoder"""
+    # Filtering stays in software; VAAPI only needs the final frames uploaded to the GPU
+    if encoder == "h264_vaapi":
+        return ",format=nv12,hwupload"
+    return ""
+
+@lru_cache(maxsize=None)
+def detect_video_encoder() -> str:
+    """Find the first hardware H.264 encoder that can actually encode on this host"""
+    override = os.environ.get("VIDEO_ENCODER")
+    if override in SUPPORTED_ENCODERS:
+        return override
+    if override:
+        # Any other name would get the libx264 argument set and fail (or misbehave) on every encode
+        logger.warning(
+            f"Ignoring unsupported VIDEO_ENCODER={override!r}; expected one of {', '.join(SUPPORTED_ENCODERS)}"
+        )
+    for encoder in HW_ENCODER_CANDIDATES:
+        # A missing or inaccessible render node would only fail (or hang) the test encode below
+        if encoder == "h264_vaapi" and not os.access(VAAPI_DEVICE, os.R_OK | os.W_OK):
+            continue
+        # Encoders can be compiled into ffmpeg without a usable device, so try a tiny encode
+        try:
+            subprocess.run([
+                "ffmpeg", "-hide_banner", "-v", "error",
+                *_encoder_device_args(encoder),
+                "-f", "lavfi", "-i", "color=c=black:s=256x256:d=0.1",
+                "-vf", "null" + _encoder_upload_filter(encoder),
+                "-frames:v", "1",
+                "-c:v", encoder,
+                "-f", "null", "-"
+            ], check=True, capture_output=True, timeout=10)
+        except (subprocess.SubprocessError, OSError):
+            continue
+        logger.info(f"Using hardware video encoder: {encoder}")
+        return encoder
+    return "libx264"
+
+def _number_sort_key(name: str) -> Tuple[int, int, str]:
+    """Sort key that orders numeric names by value and puts any other names after them"""
+    return (0, int(name), "") if name.isdigit() else (1, 0, name)
+
+# Precomputed ASCII data URI prefixes keyed by file extension
+DATA_URI_PREFIXES = {
+    "png": b"data:image/png;base64,",
+    "jpg": b"data:image/jpeg;base64,",
+    "jpeg": b"data:image/jpeg;base64,",
+    "webp": b"data:image/webp;base64,",
+    "gif": b"data:image/gif;base64,",
+}
+
+@lru_cache(maxsize=128)
+def _encode_file_cached(image_path: str, mtime_ns: int, size: int) -> str:
+    """Encode an image file as a base64 data URI.
+
+    mtime_ns and size are part of the cache key, so a rewritten file is re-encoded.
+    """
+    # Get file extension from path
+    extension = Path(image_path).suffix.lower().replace('.', '')
+    prefix = DATA_URI_PREFIXES.get(extension)
+    if prefix is None:
+        prefix = b"data:image/" + extension.encode() + b";base64,"
+    # The encoded length is known up front, so the buffer is sized once and filled in place
+    buffer = bytearray(len(prefix) + 4 * ((size + 2) // 3))
+    buffer[:len(prefix)] = prefix
+    pos = len(prefix)
+    # Stream the file through the encoder so only one chunk is held in memory
+    with open(image_path, 'rb') as image_file:
+        if size >= MMAP_MIN_SIZE:
+            # Encode straight from the page cache without copying the file into Python bytes
+            with mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+                for offset in range(0, len(view), ENCODE_CHUNK_SIZE):
+                    encoded = b64encode(view[offset:offset + ENCODE_CHUNK_SIZE])
+                    buffer[pos:pos + len(encoded)] = encoded
+                    pos += len(encoded)
+        else:
+            while chunk := image_file.read(ENCODE_CHUNK_SIZE):
+                encoded = b64encode(chunk)
+                buffer[pos:pos + len(encoded)] = encoded
+                pos += len(encoded)
+    # The file may have changed size since it was stat'ed
+    del buffer[pos:]
+    return buffer.decode('ascii')
+
+# Chapter/scene/shot ids come from a small set per project, so their relative paths are memoized.
+# Only the relative part is cached because the temp directory changes between projects.
+@lru_cache(maxsize=4096)
+def _shot_video_rel_path(chapter: str, scene: str, shot: str) -> str:
+    return f"chapter_{chapter}/scene_{scene}/shot_{shot}_video.mp4"
+
+@lru_cache(maxsize=4096)
+def _shot_image_rel_path(chapter: str, scene: str, shot: str, type_str: str) -> str:
+    return f"chapter_{chapter}/scene_{scene}/shot_{shot}_{type_str}.png"
+
+def _read_container_duration(media_path: str) -> float | None:
+    """Read a container's duration with PyAV, or None when the container doesn't record one"""
+    with av.open(media_path) as container:
+        if container.duration is None:
+            return None
+        return container.duration / av.time_base
+
 class VideoModel(BaseModel):
     model_name: str
     parameters: Dict | None = None
 
+class ShotJob(BaseModel):
+    chapter: str
+    scene: str
+    shot: str
+    prompt: str = ""
+    overwrite: bool = False
+
 class BaseVideoService(ABC):
+    # x264 settings for encodes that end up in the delivered video
+    X264_PRESET = "veryfast"
+    X264_CRF = 23
+    # Each libx264 process gets a fixed thread budget that matches the semaphore sizing below
+    X264_THREADS = 2
+
+    # Timeout for downloading finished videos; providers override this to suit their CDN
+    DOWNLOAD_TIMEOUT = aiohttp.ClientTimeout(total=300)
+
+    # Bounds how many ffmpeg/ffprobe processes run concurrently across every video service
+    FFMPEG_CONCURRENCY = max(1, (os.cpu_count() or 2) // X264_THREADS)
+    # One semaphore per event loop, since an asyncio.Semaphore binds to the first loop that waits on it
+    _ffmpeg_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+        weakref.WeakKeyDictionary()
+    )
+
     def __init__(self, aws_service: AWSService):
         self.aws_service = aws_service
-        self.temp_dir = Path(aws_service.temp_dir)
+        self._set_temp_dir(Path(aws_service.temp_dir))
+        # scene directory -> (listed_at, file names in it)
+        self._dir_cache: Dict[str, Tuple[float, frozenset]] = {}
+        # narration path -> ((mtime_ns, size), duration in seconds)
+        self._narration_durations: Dict[str, Tuple[Tuple[int, int], float]] = {}
+        # ((directory, mtime_ns) for every walked directory, videos found) from the last get_all_videos
+        self._videos_cache: Union[Tuple[Tuple[Tuple[str, int], ...], dict], None] = None
+        # Keep-alive HTTP session for downloads, created on first use inside the event loop
+        self._http_session: aiohttp.ClientSession | None = None
         logger.info(f"VideoService initialized. Using temp directory: {self.temp_dir}")
 
     def update_aws_service(self, aws_service: AWSService):
         """Update the AWS service reference and temp directory"""
         if self.aws_service != aws_service:
             self.aws_service = aws_service
-            self.temp_dir = Path(aws_service.temp_dir)
-            logger.info(f"Updated VideoService temp_dir to: {self.temp_dir}")
+            temp_dir = Path(aws_service.temp_dir)
+            # Every request builds a new AWSService for the same project, so only a different
+            # directory makes the cached listing stale; changes inside it are caught by the mtime key
+            if temp_dir != self.temp_dir:
+                self._set_temp_dir(temp_dir)
+                self._dir_cache.clear()
+                self._videos_cache = None
+                logger.info(f"Updated VideoService temp_dir to: {self.temp_dir}")
+
+    async def _get_http_session(self) -> aiohttp.ClientSession:
+        """Get the HTTP session shared by this service's downloads, creating it if needed"""
+        if self._http_session is None or self._http_session.closed:
+            self._http_session = aiohttp.ClientSession(
+                timeout=self.DOWNLOAD_TIMEOUT,
+                read_bufsize=DOWNLOAD_CHUNK_SIZE,
+                connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=600, keepalive_timeout=75)
+            )
+        return self._http_session
+
+    async def close(self):
+        """Close the shared HTTP session"""
+        if self._http_session is not None and not self._http_session.closed:
+            await self._http_session.close()
+        self._http_session = None
+
+    async def _save_response(
+        self,
+        response: aiohttp.ClientResponse,
+        path: Path,
+        on_progress: Callable[[int], None] | None = None
+    ) -> int:
+        """Stream a response body to a file, returning the number of bytes written"""
+        self.invalidate_dir_listing(path.parent)
+        bytes_written = 0
+        pending_write = None
+        with open(path, "wb", buffering=DOWNLOAD_CHUNK_SIZE) as f:
+            try:
+                async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                    if pending_write is not None:
+                        await pending_write
+                    # Writes run on a worker thread so slow storage doesn't stall the event loop,
+                    # and each one overlaps with reading the next chunk from the network
+                    pending_write = asyncio.ensure_future(asyncio.to_thread(f.write, chunk))
+                    bytes_written += len(chunk)
+                    if on_progress:
+                        on_progress(bytes_written)
+            finally:
+                # The file must not be closed while a write is still in flight
+                if pending_write is not None:
+                    await pending_write
+        return bytes_written
+
+    def _set_temp_dir(self, temp_dir: Path):
+        """Set the temp directory along with the string form used to build paths cheaply"""
+        self.temp_dir = temp_dir
+        self._temp_str = str(temp_dir)
 
     def get_local_path(self, video_path: str) -> Path:
         """Get the local path for a video file"""
-        path = self.temp_dir / video_path
+        path = Path(f"{self._temp_str}/{video_path}")
         logger.debug(f"Resolved local path: {path}")
         return path
 
     def get_shot_path(self, chapter: str, scene: str, shot: str) -> str:
         """Construct the path for a specific shot"""
-        return f"chapter_{chapter}/scene_{scene}/shot_{shot}_video.mp4"
+        return _shot_video_rel_path(chapter, scene, shot)
 
     def get_download_path(self, video_path: str) -> Path:
         """Get the download path for video files"""
-        downloads_folder = Path(self.temp_dir / video_path).parent
+        downloads_folder = self.get_local_path(video_path).parent
         downloads_folder.mkdir(parents=True, exist_ok=True)
         logger.debug(f"Created download directory: {downloads_folder}")
         return downloads_folder
 
+    def _list_scene_dir(self, chapter: str, scene: str) -> frozenset:
+        """List a scene directory once and reuse the result until it is invalidated or the TTL passes"""
+        # normpath gives the same key invalidate_dir_listing builds from a Path
+        scene_dir = os.path.normpath(f"{self._temp_str}/chapter_{chapter}/scene_{scene}")
+        now = time.monotonic()
+        cached = self._dir_cache.get(scene_dir)
+        if cached and now - cached[0] < SCENE_DIR_CACHE_TTL:
+            return cached[1]
+
+        try:
+            with os.scandir(scene_dir) as entries:
+                names = frozenset(entry.name for entry in entries)
+        except FileNotFoundError:
+            names = frozenset()
+        self._dir_cache[scene_dir] = (now, names)
+        return names
+
+    def invalidate_dir_listing(self, directory: Union[str, Path]):
+        """Drop the cached listing of a directory after a file in it was written or removed"""
+        self._dir_cache.pop(os.path.normpath(directory), None)
+
     def video_exists(self, chapter: str, scene: str, shot: str) -> bool:
         """Check if a video exists for the given shot"""
-        video_path = self.get_shot_path(chapter, scene, shot)
-        return self.get_local_path(video_path).exists()
+        return f"shot_{shot}_video.mp4" in self._list_scene_dir(chapter, scene)
 
     def _encode_image_to_base64(self, image_path: str) -> str:
         """Convert image to base64 string with data URI prefix"""
         try:
-            with open(image_path, 'rb') as image_file:
-                # Get file extension from path
-                extension = Path(image_path).suffix.lower().replace('.', '')
-                # Convert extension if needed
-                if extension == 'jpg':
-                    extension = 'jpeg'
-                # Read and encode file
-                encoded_string = base64.b64encode(image_file.read()).decode('utf-8')
-                # Return with required data URI prefix
-                return f"data:image/{extension};base64,{encoded_string}"
+            stat = os.stat(image_path)
+            return _encode_file_cached(str(image_path), stat.st_mtime_ns, stat.st_size)
         except Exception as e:
             logger.error(f"Failed to encode image to base64: {str(e)}")
             raise
 
     def get_shot_image_path(self, chapter: str, scene: str, shot: str, type_str: str) -> Path:
         """Get the path for a shot's image file (opening or closing)"""
-        return self.temp_dir / f"chapter_{chapter}/scene_{scene}/shot_{shot}_{type_str}.png"
+        return Path(f"{self._temp_str}/{_shot_image_rel_path(chapter, scene, shot, type_str)}")
+
+    def _encode_existing_image(self, image_path: Path) -> str | None:
+        """Encode an image if it exists, using a single stat for both the check and the cache key"""
+        try:
+            stat = os.stat(image_path)
+        except FileNotFoundError:
+            return None
+        return _encode_file_cached(str(image_path), stat.st_mtime_ns, stat.st_size)
 
     def _prepare_images(self, chapter: str, scene: str, shot: str, images: Union[str, List[str]], type_str: str) -> Union[str, List[str]]:
         """Prepare images for API request - convert local paths to base64"""
         try:
             if isinstance(images, list):
-                prepared_images = []
-                for idx, img in enumerate(images):
-                    image_path = self.get_shot_image_path(chapter, scene, shot, f"{type_str}_{idx}")
-                    if image_path.exists():
-                        prepared_images.append(self._encode_image_to_base64(str(image_path)))
-                    else:
-                        prepared_images.append(img)
-                return prepared_images
+                image_paths = [
+                    self.get_shot_image_path(chapter, scene, shot, f"{type_str}_{idx}")
+                    for idx in range(len(images))
+                ]
+                # Overlap file reads with encoding across a small thread pool
+                with ThreadPoolExecutor(max_workers=max(1, min(IMAGE_ENCODE_WORKERS, len(images)))) as executor:
+                    encoded_images = list(executor.map(self._encode_existing_image, image_paths))
+                return [
+                    encoded if encoded is not None else img
+                    for encoded, img in zip(encoded_images, images)
+                ]
             else:
                 image_path = self.get_shot_image_path(chapter, scene, shot, type_str)
-                if image_path.exists():
-                    return self._encode_image_to_base64(str(image_path))
-                return images
+                encoded = self._encode_existing_image(image_path)
+                return encoded if encoded is not None else images
         except Exception as e:
             logger.error(f"Failed to prepare images: {str(e)}")
             raise
 
+    def _videos_cache_valid(self) -> bool:
+        """Check that no directory walked by get_all_videos has changed since it was cached"""
+        # Adding, removing or renaming an entry bumps its parent directory's mtime
+        try:
+            return all(
+                os.stat(path).st_mtime_ns == mtime_ns
+                for path, mtime_ns in self._videos_cache[0]
+            )
+        except FileNotFoundError:
+            return False
+
     def get_all_videos(self) -> dict:
         """Get all generated videos in the project directory"""
+        if self._videos_cache is not None and self._videos_cache_valid():
+            return self._videos_cache[1].copy()
+
+        # Walk chapter_*/scene_* with scandir; DirEntry carries the type, so no extra stat calls.
+        # Each directory's mtime is taken before it is listed so changes during the walk invalidate the cache.
+        try:
+            dir_mtimes = [(self._temp_str, os.stat(self._temp_str).st_mtime_ns)]
+            with os.scandir(self._temp_str) as entries:
+                chapter_dirs = [
+                    (entry.name[len("chapter_"):], entry.path, entry.stat().st_mtime_ns)
+                    for entry in entries
+                    if entry.name.startswith("chapter_") and entry.is_dir()
+                ]
+        except FileNotFoundError:
+            return {}
+
+        found = []
+        for chapter_num, chapter_path, chapter_mtime in chapter_dirs:
+            dir_mtimes.append((chapter_path, chapter_mtime))
+            with os.scandir(chapter_path) as entries:
+                scene_dirs = [
+                    (entry.name[len("scene_"):], entry.path, entry.stat().st_mtime_ns)
+                    for entry in entries
+                    if entry.name.startswith("scene_") and entry.is_dir()
+                ]
+            for scene_num, scene_path, scene_mtime in scene_dirs:
+                dir_mtimes.append((scene_path, scene_mtime))
+                with os.scandir(scene_path) as entries:
+                    for entry in entries:
+                        name = entry.name
+                        if name.startswith("shot_") and name.endswith("_video.mp4") and entry.is_file():
+                            shot_num = name[len("shot_"):-len("_video.mp4")]
+                            found.append((chapter_num, scene_num, shot_num, name))
+
+        # Order by chapter, scene and shot number so "10" sorts after "2", as the directories are numbered
+        found.sort(key=lambda video: (
+            _number_sort_key(video[0]), _number_sort_key(video[1]), _number_sort_key(video[2])
+        ))
+        # Build web-friendly paths from the components; only the root needs its separators converted
+        web_root = "/" + self._temp_str.replace('\\', '/')
         videos = {}
-        if self.temp_dir.exists():
-            for chapter_dir in self.temp_dir.glob("chapter_*"):
-                chapter_num = chapter_dir.name.split("_")[1]
-                for scene_dir in chapter_dir.glob("scene_*"):
-                    scene_num = scene_dir.name.split("_")[1]
-                    for shot_dir in scene_dir.glob("shot_*"):
-                        shot_num = shot_dir.name.split("_")[1]
-                        video_path = shot_dir.parent / f"shot_{shot_num}_video.mp4"
-                        if video_path.exists():
-                            key = f"{chapter_num}-{scene_num}-{shot_num}"
-                            # Convert to web-friendly path
-                            relative_path = str(video_path).replace('\\', '/')
-                            videos[key] = f"/{relative_path}"
-        return videos
+        for chapter_num, scene_num, shot_num, name in found:
+            videos[f"{chapter_num}-{scene_num}-{shot_num}"] = f"{web_root}/chapter_{chapter_num}/scene_{scene_num}/{name}"
+        self._videos_cache = (tuple(dir_mtimes), videos)
+        return videos.copy()
 
     @abstractmethod
     async def generate_video(
@@ -123,23 +463,191 @@ class BaseVideoService(ABC):
         """Generate video for a specific shot using the implemented service"""
         pass
 
-    def _apply_black_and_white(self, input_path: Path, output_path: Path) -> bool:
+    async def generate_videos(
+        self,
+        jobs: List[ShotJob],
+        max_concurrency: int = 8
+    ) -> List[Tuple[bool, str | None]]:
+        """Generate videos for several shots concurrently, returning results in job order"""
+        # Generation is network-bound on the provider side, so many shots can be in flight at once
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def generate(job: ShotJob) -> Tuple[bool, str | None]:
+            async with semaphore:
+                try:
+                    return await self.generate_video(
+                        chapter=job.chapter,
+                        scene=job.scene,
+                        shot=job.shot,
+                        prompt=job.prompt,
+                        overwrite=job.overwrite
+                    )
+                except Exception as e:
+                    # One failed shot shouldn't cancel the rest of the batch
+                    logger.error(f"Video generation failed for shot {job.chapter}/{job.scene}/{job.shot}: {str(e)}")
+                    return False, None
+
+        return await asyncio.gather(*(generate(job) for job in jobs))
+
+    def _video_codec_args(self, encoder: str) -> List[str]:
+        """Get the output arguments for a video encoder"""
+        crf = self.X264_CRF
+        if encoder == "h264_nvenc":
+            return ["-c:v", encoder, "-preset", "p4",
+                    "-rc", "vbr", "-cq", str(crf), "-pix_fmt", "yuv420p"]
+        if encoder == "h264_qsv":
+            return ["-c:v", encoder, "-preset", "veryfast",
+                    "-global_quality", str(crf), "-pix_fmt", "nv12"]
+        if encoder == "h264_vaapi":
+            # Frames arrive already uploaded as nv12 (see _hw_upload_filter), so no -pix_fmt here
+            return ["-c:v", encoder, "-rc_mode", "CQP", "-qp", str(crf)]
+        return ["-c:v", "libx264", "-preset", self.X264_PRESET, "-crf", str(crf),
+                "-threads", str(self.X264_THREADS), "-pix_fmt", "yuv420p"]
+
+    def _hw_device_args(self, encoder: str) -> List[str]:
+        """Get the global options an encoder needs, placed before the inputs"""
+        return _encoder_device_args(encoder)
+
+    def _hw_upload_filter(self, encoder: str) -> str:
+        """Get the filters that end every video chain feeding an encoder"""
+        return _encoder_upload_filter(encoder)
+
+    async def _video_encoder(self) -> str:
+        """Get the detected video encoder, running the blocking detection on a worker thread"""
+        if detect_video_encoder.cache_info().currsize:
+            return detect_video_encoder()
+        return await asyncio.to_thread(detect_video_encoder)
+
+    async def _run_encode(self, build_cmd: Callable[[str], List[str]]) -> bytes:
+        """Run an encode built for the detected encoder, retrying with libx264 if a hardware encode fails"""
+        encoder = await self._video_encoder()
+        try:
+            return await self._run_ffmpeg(build_cmd(encoder))
+        except subprocess.CalledProcessError as e:
+            if encoder == "libx264":
+                raise
+            # e.g. NVENC's concurrent session limit on consumer GPUs, or a broken render node
+            logger.warning(f"{encoder} encode failed, retrying with libx264: {_stderr_tail_text(e)}")
+            return await self._run_ffmpeg(build_cmd("libx264"))
+
+    @classmethod
+    def _ffmpeg_semaphore(cls) -> asyncio.Semaphore:
+        """Get the ffmpeg concurrency limit for the running event loop, creating it on first use"""
+        loop = asyncio.get_running_loop()
+        semaphore = cls._ffmpeg_semaphores.get(loop)
+        if semaphore is None:
+            semaphore = cls._ffmpeg_semaphores[loop] = asyncio.Semaphore(cls.FFMPEG_CONCURRENCY)
+        return semaphore
+
+    async def _run_ffmpeg(self, cmd: List[str]) -> bytes:
+        """Run an ffmpeg/ffprobe command without blocking the event loop"""
+        # Spawned with exec and no preexec_fn so CPython can use vfork/posix_spawn rather than
+        # a full fork that copies this process's page tables
+        # stderr goes to an unlinked temp file so long encodes don't buffer their logs in RAM
+        with tempfile.TemporaryFile() as stderr_file:
+            async with self._ffmpeg_semaphore():
+                process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=stderr_file
+                )
+                stdout, _ = await process.communicate()
+            if process.returncode:
+                raise subprocess.CalledProcessError(
+                    process.returncode, cmd, stdout, _read_stderr_tail(stderr_file)
+                )
+        return stdout
+
+    async def _probe_audio_codec(self, video_path: Union[str, Path]) -> str | None:
+        """Get the codec name of the first audio stream, or None if there is no audio"""
+        stdout = await self._run_ffmpeg([
+            "ffprobe", "-v", "error",
+            "-select_streams", "a:0",
+            "-show_entries", "stream=codec_name",
+            "-of", "default=noprint_wrappers=1:nokey=1",
+            str(video_path)
+        ])
+        return stdout.decode().strip() or None
+
+    def _make_work_dir(self, prefix: str, expected_bytes: int = 0) -> Path:
+        """Create a uniquely named scratch directory for one render's intermediate files"""
+        # RAM-backed scratch is small, so renders whose intermediates won't comfortably fit use disk
+        root = SCRATCH_ROOT
+        try:
+            if expected_bytes > shutil.disk_usage(root).free * SCRATCH_MAX_FILL:
+                root = tempfile.gettempdir()
+        except OSError:
+            root = tempfile.gettempdir()
+        # Unique names keep concurrent renders of the same scene or output from sharing files.
+        # The directory sits directly in the scratch root, so removing it leaves nothing behind
+        return Path(tempfile.mkdtemp(prefix=f"movie_maker_{self.temp_dir.name}_{prefix}", dir=root))
+
+    def _write_filter_script(self, work_dir: Path, filters: List[str]) -> Path:
+        """Write a filter graph to a script file so it is not passed (and re-parsed) through argv"""
+        script_path = work_dir / "filter.graph"
+        script_path.write_text(";\n".join(filters))
+        return script_path
+
+    async def _probe_duration(self, media_path: Union[str, Path]) -> float:
+        """Get the container duration of a media file in seconds"""
+        if av is not None:
+            try:
+                duration = await asyncio.to_thread(_read_container_duration, str(media_path))
+                if duration is not None:
+                    return duration
+            except Exception as e:
+                logger.debug(f"PyAV could not read the duration of {media_path}: {e}")
+        stdout = await self._run_ffmpeg([
+            "ffprobe", "-v", "error",
+            "-show_entries", "format=duration",
+            "-of", "default=noprint_wrappers=1:nokey=1",
+            str(media_path)
+        ])
+        return float(stdout.decode().strip())
+
+    async def _probe_narration_duration(self, narration_path: Path) -> float:
+        """Get the narration duration, reusing the value probed earlier while the file is unchanged"""
+        stat = os.stat(narration_path)
+        # Regenerated narration gets a new mtime/size, so it never matches (and replaces) the stale entry
+        version = (stat.st_mtime_ns, stat.st_size)
+        cached = self._narration_durations.get(str(narration_path))
+        if cached and cached[0] == version:
+            return cached[1]
+        duration = await self._read_narration_duration(narration_path)
+        self._narration_durations[str(narration_path)] = (version, duration)
+        return duration
+
+    async def _read_narration_duration(self, narration_path: Path) -> float:
+        """Read the narration duration from its WAV header, falling back to ffprobe"""
+        try:
+            with wave.open(str(narration_path), 'rb') as wav_file:
+                frames = wav_file.getnframes()
+                frame_size = wav_file.getsampwidth() * wav_file.getnchannels()
+                duration = frames / wav_file.getframerate()
+            # Streamed WAVs can carry a placeholder data size, so only trust a header that fits the file
+            if frames and frames * frame_size <= os.path.getsize(narration_path):
+                return duration
+        except (wave.Error, EOFError) as e:
+            logger.debug(f"Could not read WAV header of {narration_path}: {e}")
+        return await self._probe_duration(narration_path)
+
+    async def _apply_black_and_white(self, input_path: Path, output_path: Path) -> bool:
         """Apply black and white filter to a video"""
+        self.invalidate_dir_listing(output_path.parent)
         try:
-            subprocess.run([
+            await self._run_encode(lambda encoder: [
                 "ffmpeg", "-y",
+                *self._hw_device_args(encoder),
                 "-i", str(input_path),
-                "-vf", "hue=s=0",
-                "-c:v", "libx264",
-                "-preset", "medium",
-                "-crf", "23",
+                "-vf", "hue=s=0" + self._hw_upload_filter(encoder),
+                *self._video_codec_args(encoder),
+                "-movflags", "+faststart",
                 str(output_path)
-            ], check=True, capture_output=True)
+            ])
             return True
         except subprocess.CalledProcessError as e:
             logger.error(f"Error applying black and white filter: {e}")
-            if hasattr(e, "stderr"):
-                logger.error(f"FFmpeg stderr: {e.stderr.decode()}")
+            logger.error("FFmpeg stderr (tail): %s", _stderr_tail_text(e))
             return False
 
     async def generate_scene_video(
@@ -153,264 +661,110 @@ class BaseVideoService(ABC):
             narration_path = scene_path / "narration.wav"
             bg_music_path = scene_path / "background_music.mp3"
             output_path = scene_path / "final_scene.mp4"
-            temp_concat_video = scene_path / "temp_concat.mp4"
-
             # Validate input files
             if not narration_path.exists():
                 raise ValueError("Missing narration.wav file")
             if not bg_music_path.exists():
                 raise ValueError("Missing background_music.mp3 file")
 
-            # Get and sort video files
-            video_files = list(scene_path.glob("shot_*_video.mp4"))
-            if not video_files:
+            # Get and sort video files in a single directory pass, parsing each shot number once
+            with os.scandir(scene_path) as entries:
+                numbered_files = sorted(
+                    (int(entry.name.split("_")[1]), Path(entry.path))
+                    for entry in entries
+                    if entry.name.startswith("shot_") and entry.name.endswith("_video.mp4")
+                )
+            if not numbered_files:
                 raise ValueError("No video files found for this scene")
-            
-            video_files = sorted(video_files, key=lambda p: int(p.stem.split("_")[1]))
+            video_files = [p for _, p in numbered_files]
 
+            # The filter script lives in scratch space, only the final video goes to scene_path
+            work_dir = self._make_work_dir(f"chapter_{chapter}_scene_{scene}_")
             try:
-                # First normalize all videos with consistent dimensions and framerate
-                normalized_videos = []
-                for i, video in enumerate(video_files):
-                    normalized_path = scene_path / f"normalized_{i}.mp4"
-                    normalized_videos.append(normalized_path)
-                    
-                    video_filters = [
-                        "scale=1280:768:force_original_aspect_ratio=decrease",
-                        "pad=1280:768:(ow-iw)/2:(oh-ih)/2",
-                        "fps=30",
-                        "setsar=1:1"
-                    ]
-                    if black_and_white:
-                        video_filters.append("hue=s=0")
-                    
-                    subprocess.run([
-                        "ffmpeg", "-y",
-                        "-i", str(video),
-                        "-vf", ",".join(video_filters),
-                        "-c:v", "libx264",
-                        "-preset", "medium",
-                        "-crf", "23",
-                        str(normalized_path)
-                    ], check=True, capture_output=True)
-
-                # Get narration duration
-                narration_duration_cmd = [
-                    "ffprobe", "-v", "error",
-                    "-show_entries", "format=duration",
-                    "-of", "default=noprint_wrappers=1:nokey=1",
-                    str(narration_path)
-                ]
-                result = subprocess.run(narration_duration_cmd, capture_output=True, text=True, check=True)
-                narration_duration = float(result.stdout.strip())
-
-                # Calculate total video duration and individual video durations
-                video_durations = []
-                total_video_duration = 0
-                for video in normalized_videos:
-                    duration_cmd = [
-                        "ffprobe", "-v", "error",
-                        "-show_entries", "format=duration",
-                        "-of", "default=noprint_wrappers=1:nokey=1",
-                        str(video)
-                    ]
-                    result = subprocess.run(duration_cmd, capture_output=True, text=True, check=True)
-                    duration = float(result.stdout.strip())
-                    video_durations.append(duration)
-                    total_video_duration += duration
+                # Get narration duration and individual video durations
+                narration_duration, *video_durations = await asyncio.gather(
+                    self._probe_narration_duration(narration_path),
+                    *(self._probe_duration(video) for video in video_files)
+                )
+                total_video_duration = sum(video_durations)
 
                 duration_diff = abs(narration_duration - total_video_duration)
                 use_black_screens = duration_diff >= 1 and narration_duration > total_video_duration
 
-                # Process videos with transitions
-                processed_videos = []
+                # Every shot is normalized, faded and concatenated inside one filter graph,
+                # so the whole scene costs a single decode and a single encode
+                video_filters = NORMALIZE_FILTERS + (",hue=s=0" if black_and_white else "")
+                gap_filter = ""
+                if use_black_screens and len(video_files) > 1:
+                    # Spread the missing time evenly as black gaps padded onto every shot but the last
+                    gap_duration = (narration_duration - total_video_duration) / (len(video_files) - 1)
+                    gap_filter = f",tpad=stop_mode=add:stop_duration={gap_duration}:color=black"
+
+                narration_input = len(video_files)
+                music_input = narration_input + 1
+                filters = []
+                for i, duration in enumerate(video_durations):
+                    shot_filters = video_filters + "," + FADE_FILTERS.format(fade_out_start=duration - 1)
+                    if i < len(video_files) - 1:
+                        shot_filters += gap_filter
+                    filters.append(f"[{i}:v]{shot_filters}[v{i}]")
+                concat_inputs = "".join(f"[v{i}]" for i in range(len(video_files)))
+
+                output_args = []
                 if use_black_screens:
-                    # Calculate total black screen duration needed
-                    total_black_screen_duration = narration_duration - total_video_duration
-                    # Number of black screens needed (between videos)
-                    num_black_screens = len(normalized_videos) - 1
-                    individual_black_screen_duration = total_black_screen_duration / num_black_screens if num_black_screens > 0 else 0
-                    
-                    final_videos = []  # List to store all video segments in order
-                    
-                    # Process first video
-                    first_video = normalized_videos[0]
-                    processed_path = scene_path / f"processed_shot_0.mp4"
-                    final_videos.append(processed_path)
-                    
-                    subprocess.run([
-                        "ffmpeg", "-y",
-                        "-i", str(first_video),
-                        "-vf", f"fade=t=in:st=0:d=1,fade=t=out:st={video_durations[0]-1}:d=1",
-                        "-c:v", "libx264",
-                        "-preset", "medium",
-                        "-crf", "23",
-                        str(processed_path)
-                    ], check=True, capture_output=True)
-
-                    # Process remaining videos with black screens before them
-                    for i in range(1, len(normalized_videos)):
-                        black_screen = scene_path / f"black_screen_{i}.mp4"
-                        processed_path = scene_path / f"processed_shot_{i}.mp4"
-                        
-                        # Create black screen
-                        subprocess.run([
-                            "ffmpeg", "-y",
-                            "-f", "lavfi",
-                            "-i", f"color=c=black:s=1280x768:d={individual_black_screen_duration}",
-                            "-c:v", "libx264",
-                            "-preset", "medium",
-                            "-crf", "23",
-                            str(black_screen)
-                        ], check=True, capture_output=True)
-
-                        # Process video with fades
-                        subprocess.run([
-                            "ffmpeg", "-y",
-                            "-i", str(normalized_videos[i]),
-                            "-vf", f"fade=t=in:st=0:d=1,fade=t=out:st={video_durations[i]-1}:d=1",
-                            "-c:v", "libx264",
-                            "-preset", "medium",
-                            "-crf", "23",
-                            str(processed_path)
-                        ], check=True, capture_output=True)
-
-                        final_videos.append(black_screen)
-                        final_videos.append(processed_path)
-
-                    # Create concat file
-                    concat_file = scene_path / "concat.txt"
-                    with open(concat_file, "w") as f:
-                        for video in final_videos:
-                            f.write(f"file '{video.name}'\n")
-
-                    # Concatenate all videos into temp file first
-                    temp_concat_video = scene_path / "temp_concat.mp4"
-                    subprocess.run([
-                        "ffmpeg", "-y",
-                        "-f", "concat",
-                        "-safe", "0",
-                        "-i", str(concat_file),
-                        "-c", "copy",
-                        str(temp_concat_video)
-                    ], check=True, capture_output=True)
-
-                    # Now add audio tracks to the final output
-                    output_path = scene_path / "final_scene.mp4"
-                    subprocess.run([
-                        "ffmpeg", "-y",
-                        "-i", str(temp_concat_video),
+                    filters += [
+                        NARRATION_FORMAT_FILTER.format(source=f"{narration_input}:a"),
+                        MUSIC_FILTER.format(source=f"{music_input}:a", fade_out_start=narration_duration - 1.5),
+                    ]
+                else:
+                    # Centre the narration when the video is longer than it
+                    audio_delay = 0
+                    if total_video_duration > narration_duration:
+                        audio_delay = (total_video_duration - narration_duration) / 2
+                    filters += [
+                        f"[{narration_input}:a]adelay={int(audio_delay*1000)}|{int(audio_delay*1000)}[d]",
+                        NARRATION_FORMAT_FILTER.format(source="d"),
+                        MUSIC_FILTER.format(source=f"{music_input}:a", fade_out_start=total_video_duration - 1.5),
+                    ]
+                    output_args = ["-t", str(total_video_duration)]
+                filters.append(AUDIO_MIX_FILTER)
+
+                def build_cmd(encoder: str) -> List[str]:
+                    # The concat output is the one chain that feeds the encoder
+                    graph = filters + [
+                        f"{concat_inputs}concat=n={len(video_files)}:v=1:a=0{self._hw_upload_filter(encoder)}[v]"
+                    ]
+                    cmd = ["ffmpeg", "-y", *self._hw_device_args(encoder)]
+                    for video in video_files:
+                        cmd += ["-i", str(video)]
+                    return cmd + [
                         "-i", str(narration_path),
                         "-i", str(bg_music_path),
-                        "-filter_complex",
-                        "[1:a]aformat=sample_fmts=fltp:sample_rates=44100[narr];"
-                        "[2:a]aformat=sample_fmts=fltp:sample_rates=44100,volume=0.1,"
-                        "afade=t=in:st=0:d=2,"
-                        f"afade=t=out:st={narration_duration-1.5}:d=1.5[music];"
-                        "[narr][music]amix=inputs=2:duration=longest:weights=1 0.8[aout]",
-                        "-map", "0:v",
-                        "-map", "[aout]",
-                        "-c:v", "copy",
+                        "-filter_complex_script", str(self._write_filter_script(work_dir, graph)),
+                        "-map", "[v]",
+                        "-map", "[a]",
+                        *output_args,
+                        *self._video_codec_args(encoder),
                         "-c:a", "aac",
                         "-b:a", "192k",
+                        "-movflags", "+faststart",
                         str(output_path)
-                    ], check=True, capture_output=True)
-
-                    # Cleanup temporary files
-                    concat_file.unlink(missing_ok=True)
-                    temp_concat_video.unlink(missing_ok=True)
-                    for video in final_videos:
-                        if video.exists():
-                            video.unlink()
-
-                    if output_path.exists():
-                        logger.info("Successfully created scene video with audio")
-                        return True, str(output_path)
-                    else:
-                        raise ValueError("Output file was not created")
-
-                else:  # When no black screens are needed
-                    # Process videos with transitions
-                    processed_videos = []
-                    for i, video in enumerate(normalized_videos):
-                        processed_path = scene_path / f"processed_shot_{i}.mp4"
-                        processed_videos.append(processed_path)
-                        
-                        subprocess.run([
-                            "ffmpeg", "-y",
-                            "-i", str(video),
-                            "-vf", f"fade=t=in:st=0:d=1,fade=t=out:st={video_durations[i]-1}:d=1",
-                            "-c:v", "libx264",
-                            "-preset", "medium",
-                            "-crf", "23",
-                            str(processed_path)
-                        ], check=True, capture_output=True)
-
-                    # Create concat file only if we have processed videos
-                    if processed_videos:
-                        # Create concat file for final merge
-                        concat_file = scene_path / "concat.txt"
-                        with open(concat_file, "w") as f:
-                            for video in processed_videos:
-                                f.write(f"file '{video.name}'\n")
-
-                        # Merge all processed videos
-                        temp_concat_video = scene_path / "temp_concat.mp4"
-                        subprocess.run([
-                            "ffmpeg", "-y",
-                            "-f", "concat",
-                            "-safe", "0",
-                            "-i", str(concat_file),
-                            "-c", "copy",
-                            str(temp_concat_video)
-                        ], check=True, capture_output=True)
-
-                        # Calculate audio delay if video is longer than narration
-                        audio_delay = 0
-                        if total_video_duration > narration_duration:
-                            audio_delay = (total_video_duration - narration_duration) / 2
-
-                        # Add audio tracks to the final output
-                        output_path = scene_path / "final_scene.mp4"
-                        subprocess.run([
-                            "ffmpeg", "-y",
-                            "-i", str(temp_concat_video),
-                            "-i", str(narration_path),
-                            "-i", str(bg_music_path),
-                            "-filter_complex",
-                            f"[1:a]adelay={int(audio_delay*1000)}|{int(audio_delay*1000)}[delayed_narr];"
-                            "[delayed_narr]aformat=sample_fmts=fltp:sample_rates=44100[narr];"
-                            "[2:a]aformat=sample_fmts=fltp:sample_rates=44100,volume=0.1,"
-                            "afade=t=in:st=0:d=2,"
-                            f"afade=t=out:st={total_video_duration-1.5}:d=1.5[music];"
-                            "[narr][music]amix=inputs=2:duration=longest:weights=1 0.8[aout]",
-                            "-map", "0:v",
-                            "-map", "[aout]",
-                            "-t", str(total_video_duration),
-                            "-c:v", "copy",
-                            "-c:a", "aac",
-                            "-b:a", "192k",
-                            str(output_path)
-                        ], check=True, capture_output=True)
-
-                        # Cleanup temporary files
-                        concat_file.unlink(missing_ok=True)
-                        temp_concat_video.unlink(missing_ok=True)
-                        for video in processed_videos:
-                            if video.exists():
-                                video.unlink()
-
-                        if output_path.exists():
-                            logger.info("Successfully created scene video with audio")
-                            return True, str(output_path)
-                    
-                    raise ValueError("No videos were processed")
+                    ]
+
+                self.invalidate_dir_listing(scene_path)
+                await self._run_encode(build_cmd)
 
+                if output_path.exists():
+                    logger.info("Successfully created scene video with audio")
+                    return True, str(output_path)
+                raise ValueError("Output file was not created")
             except subprocess.CalledProcessError as e:
                 logger.error("FFmpeg error: %s", str(e))
-                if hasattr(e, "stderr"):
-                    logger.error("FFmpeg stderr: %s", e.stderr.decode())
+                logger.error("FFmpeg stderr (tail): %s", _stderr_tail_text(e))
                 raise ValueError("Error combining videos and audio")
+            finally:
+                # Clean up all intermediate files in one pass
+                shutil.rmtree(work_dir, ignore_errors=True)
 
         except Exception as e:
             logger.error("Error generating scene video: %s", str(e))
@@ -423,49 +777,50 @@ class BaseVideoService(ABC):
                 logger.error("No video paths provided")
                 return False
 
-            # Create a directory for temporary files
-            temp_dir = Path(output_path).parent / "temp_combine"
-            temp_dir.mkdir(parents=True, exist_ok=True)
+            # Create a directory for temporary files; the normalized segments take about as much space as the inputs
+            temp_dir = self._make_work_dir(
+                f"combine_{Path(output_path).stem}_",
+                expected_bytes=sum(os.path.getsize(video) for video in video_paths)
+            )
 
             try:
-                # First normalize all videos with consistent dimensions and framerate
-                normalized_videos = []
-                for i, video in enumerate(video_paths):
-                    normalized_path = temp_dir / f"normalized_{i}.mp4"
-                    normalized_videos.append(normalized_path)
-                    
-                    # Normalize video
-                    subprocess.run([
+                async def normalize(i: int, video: str) -> Path:
+                    # MPEG-TS intermediates can be joined byte-wise with the concat protocol
+                    normalized_path = temp_dir / f"normalized_{i}.ts"
+                    # AAC audio is already what the output needs, so copy it instead of re-encoding
+                    if await self._probe_audio_codec(video) == "aac":
+                        audio_args = ["-c:a", "copy"]
+                    else:
+                        audio_args = ["-c:a", "aac", "-b:a", "192k"]
+
+                    await self._run_encode(lambda encoder: [
                         "ffmpeg", "-y",
+                        *self._hw_device_args(encoder),
                         "-i", str(video),
-                        "-vf", "scale=1280:768:force_original_aspect_ratio=decrease,"
-                               "pad=1280:768:(ow-iw)/2:(oh-ih)/2,"
-                               "fps=30,"
-                               "setsar=1:1",
-                        "-c:v", "libx264",
-                        "-preset", "medium",
-                        "-crf", "23",
-                        "-c:a", "aac",
-                        "-b:a", "192k",
+                        "-vf", NORMALIZE_FILTERS + self._hw_upload_filter(encoder),
+                        *self._video_codec_args(encoder),
+                        *audio_args,
+                        "-f", "mpegts",
                         str(normalized_path)
-                    ], check=True, capture_output=True)
-
-                # Create concat file with absolute paths
-                concat_file = temp_dir / "concat.txt"
-                with open(concat_file, "w") as f:
-                    for video in normalized_videos:
-                        # Use absolute paths to avoid path resolution issues
-                        f.write(f"file '{video.absolute()}'\n")
-
-                # Concatenate all normalized videos
-                subprocess.run([
+                    ])
+                    return normalized_path
+
+                # First normalize all videos concurrently with consistent dimensions and framerate
+                normalized_videos = await asyncio.gather(
+                    *(normalize(i, video) for i, video in enumerate(video_paths))
+                )
+
+                # Concatenate all normalized videos with the concat protocol, so no list file is
+                # needed and ffmpeg reads the segments as one continuous stream
+                self.invalidate_dir_listing(Path(output_path).parent)
+                await self._run_ffmpeg([
                     "ffmpeg", "-y",
-                    "-f", "concat",
-                    "-safe", "0",
-                    "-i", str(concat_file),
+                    "-i", "concat:" + "|".join(str(video.absolute()) for video in normalized_videos),
                     "-c", "copy",
+                    "-bsf:a", "aac_adtstoasc",
+                    "-movflags", "+faststart",
                     str(output_path)
-                ], check=True, capture_output=True)
+                ])
 
                 if Path(output_path).exists():
                     logger.info("Successfully combined videos")
@@ -474,15 +829,12 @@ class BaseVideoService(ABC):
                     raise ValueError("Output file was not created")
 
             finally:
-                # Clean up temporary files
-                import shutil
-                if temp_dir.exists():
-                    shutil.rmtree(temp_dir)
+                # Clean up all temporary files in one pass
+                shutil.rmtree(temp_dir, ignore_errors=True)
 
         except subprocess.CalledProcessError as e:
             logger.error(f"FFmpeg error: {e}")
-            if hasattr(e, "stderr"):
-                logger.error(f"FFmpeg stderr: {e.stderr.decode()}")
+            logger.error("FFmpeg stderr (tail): %s", _stderr_tail_text(e))
             return False
         except Exception as e:
             logger.error(f"Error combining videos: {str(e)}")
@@ -1,10 +1,12 @@
+from collections import OrderedDict
 from enum import Enum
-from typing import Type, Dict, List
+from typing import Set, Tuple
 from src.services.video_service_base import BaseVideoService
 from src.services.video_service_replicate import ReplicateVideoService
 from src.services.video_service_runaway_ml import RunwayMLVideoService
 from src.services.aws_service import AWSService
-import subprocess
+import asyncio
+import threading
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,35 +15,70 @@ class VideoProvider(str, Enum):
     REPLICATE = "replicate"
     RUNWAYML = "runwayml"
 
+# How many (provider, project) services are kept; the least recently used one beyond this is closed
+MAX_CACHED_SERVICES = 16
+
 class VideoServiceFactory:
-    _instances: Dict[VideoProvider, BaseVideoService] = {}
+    # Keyed by provider and project temp dir so concurrent requests for different
+    # projects never swap the temp_dir of a service another request is using.
+    # Ordered by last use so the server doesn't keep a client and HTTP session for every project it has seen
+    _instances: "OrderedDict[Tuple[VideoProvider, str], BaseVideoService]" = OrderedDict()
+    _lock = threading.Lock()
+    # Close tasks for evicted services, referenced until they finish
+    _closing: Set[asyncio.Task] = set()
 
     @classmethod
     def create_video_service(cls, provider: VideoProvider, aws_service: AWSService) -> BaseVideoService:
         """Create or return an existing video service instance"""
-        # If we already have an instance for this provider but with a different aws_service,
-        # update its aws_service and temp_dir
-        if provider in cls._instances:
-            service = cls._instances[provider]
-            # Update the service with the new aws_service if needed
-            if service.aws_service != aws_service:
-                service.update_aws_service(aws_service)
+        key = (provider, str(aws_service.temp_dir))
+        with cls._lock:
+            # If we already have an instance for this provider and project, point it at the latest aws_service
+            if key in cls._instances:
+                cls._instances.move_to_end(key)
+                service = cls._instances[key]
+                # Update the service with the new aws_service if needed
+                if service.aws_service != aws_service:
+                    service.update_aws_service(aws_service)
+                return service
+
+            providers = {
+                VideoProvider.REPLICATE: ReplicateVideoService,
+                VideoProvider.RUNWAYML: RunwayMLVideoService
+            }
+
+            service_class = providers.get(provider)
+            if not service_class:
+                raise ValueError(f"Invalid video provider: {provider}")
+
+            service = cls._instances[key] = service_class(aws_service)
+            while len(cls._instances) > MAX_CACHED_SERVICES:
+                _, evicted = cls._instances.popitem(last=False)
+                cls._close_evicted(evicted)
+
             return service
-            
-        providers = {
-            VideoProvider.REPLICATE: ReplicateVideoService,
-            VideoProvider.RUNWAYML: RunwayMLVideoService
-        }
-        
-        service_class = providers.get(provider)
-        if not service_class:
-            raise ValueError(f"Invalid video provider: {provider}")
-            
-        cls._instances[provider] = service_class(aws_service)
-        
-        return cls._instances[provider]
+
+    @classmethod
+    def _close_evicted(cls, service: BaseVideoService):
+        """Close an evicted service's HTTP session on the running event loop"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Any session it holds was opened on a loop that is no longer running, so it cannot be awaited
+            return
+        task = loop.create_task(service.close())
+        cls._closing.add(task)
+        task.add_done_callback(cls._closing.discard)
+
+    @classmethod
+    async def close_instances(cls):
+        """Close the HTTP sessions held by every cached instance"""
+        with cls._lock:
+            services = list(cls._instances.values())
+        for service in services:
+            await service.close()
 
     @classmethod
     def reset_instances(cls):
         """Clear all cached instances - mainly useful for testing"""
-        cls._instances.clear()
\ No newline at end of file
+        with cls._lock:
+            cls._instances.clear()
\ No newline at end of file
@@ -1,6 +1,8 @@
+import asyncio
 import os
 import logging
 import time
+from dataclasses import asdict, dataclass
 from typing import Tuple
 import aiohttp
 import replicate
@@ -13,9 +15,21 @@ logger = logging.getLogger(__name__)
 
 # Set environment variable to control replicate client timeout
 # Default is 600 seconds (10 minutes), increase it to 1800 seconds (30 minutes)
-os.environ["REPLICATE_CLIENT_TIMEOUT"] = "1800"
+REPLICATE_RUN_TIMEOUT = 1800
+os.environ["REPLICATE_CLIENT_TIMEOUT"] = str(REPLICATE_RUN_TIMEOUT)
+
+@dataclass(frozen=True, slots=True)
+class KlingParams:
+    """Generation settings sent to the Kling model with every shot"""
+    duration: float = 10.0
+    cfg_scale: float = 1.0
+    aspect_ratio: str = "16:9"
+    negative_prompt: str = "extra characters, moving through walls, people sliding on the floor"
 
 class ReplicateVideoService(BaseVideoService):
+    # Replicate videos can take a long time to download, so allow up to 30 minutes
+    DOWNLOAD_TIMEOUT = aiohttp.ClientTimeout(total=1800, connect=60, sock_connect=60, sock_read=1800)
+
     def __init__(self, aws_service: AWSService):
         super().__init__(aws_service)
         logger.info("Initializing ReplicateVideoService")
@@ -25,17 +39,24 @@ class ReplicateVideoService(BaseVideoService):
             raise ValueError("Missing required Replicate API token in environment variables")
 
         os.environ["REPLICATE_API_TOKEN"] = self.replicate_token
+        self.params = KlingParams()
         self.video_model = VideoModel(
             model_name="kwaivgi/kling-v1.6-pro",
-            parameters={
-                "cfg_scale": 1,
-                "duration": 10,
-                "aspect_ratio": "16:9",
-                "negative_prompt": "extra characters, moving through walls, people sliding on the floor"
-            }
+            parameters=asdict(self.params)
         )
+        # The model parameters are fixed, so their typed request fields are built once
+        self._base_input = self._build_base_input()
         logger.info("Initialized ReplicateVideoService")
 
+    def _build_base_input(self) -> dict:
+        """Build the Replicate input fields that are the same for every shot"""
+        return {
+            "duration": self.params.duration,
+            "cfg_scale": self.params.cfg_scale,
+            "aspect_ratio": self.params.aspect_ratio,
+            "negative_prompt": self.params.negative_prompt
+        }
+
     async def generate_video(
         self,
         prompt: str,
@@ -66,22 +87,31 @@ class ReplicateVideoService(BaseVideoService):
             logger.info("Calling Replicate API for video generation")
             reference_image = self._encode_image_to_base64(str(frame_path))
             
-            # Call Replicate API with proper type handling
-            if not self.video_model.parameters:
-                raise ValueError("Video model parameters are not set")
-
-            output = replicate.run(
-                self.video_model.model_name,
+            # Call Replicate API with the precomputed parameters plus this shot's prompt and frame.
+            # The async client polls the prediction without holding a worker thread per shot
+            prediction = await replicate.models.predictions.async_create(
+                model=self.video_model.model_name,
                 input={
+                    **self._base_input,
                     "prompt": str(prompt),
-                    "start_image": reference_image,
-                    "duration": float(self.video_model.parameters.get("duration", 10)),
-                    "cfg_scale": float(self.video_model.parameters.get("cfg_scale", 1)), 
-                    "aspect_ratio": str(self.video_model.parameters.get("aspect_ratio", "16:9")),
-                    "negative_prompt": str(self.video_model.parameters.get("negative_prompt", ""))
+                    "start_image": reference_image
                 }
             )
-
+            try:
+                await asyncio.wait_for(prediction.async_wait(), timeout=REPLICATE_RUN_TIMEOUT)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                # Stop the billed prediction instead of letting it run on after we gave up
+                try:
+                    await prediction.async_cancel()
+                except Exception as cancel_error:
+                    logger.error(f"Failed to cancel Replicate prediction {prediction.id}: {str(cancel_error)}")
+                raise
+
+            if prediction.status != "succeeded":
+                logger.error(f"Replicate prediction {prediction.id} {prediction.status}: {prediction.error}")
+                raise Exception(f"Failed to generate video with Replicate: {prediction.error or prediction.status}")
+
+            output = prediction.output
             if not output:
                 logger.error("Replicate API failed to return valid response")
                 raise Exception("Failed to generate video with Replicate")
@@ -89,22 +119,21 @@ class ReplicateVideoService(BaseVideoService):
             # Download the completed video
             save_path = self.get_download_path(video_path)
             downloaded_path = save_path / f"{Path(video_path).stem}.mp4"
-            # Extract video URL from response
-            # output is an iterator, get the first (and only) URL
-            video_url = next(output)
+            # Extract video URL from response. The prediction output is the file URL, or a list
+            # holding it for models with several outputs
+            if isinstance(output, str):
+                video_url = output
+            elif hasattr(output, "url"):
+                video_url = output.url
+            else:
+                video_url = next(iter(output))
             logger.info(f"Got video URL from Replicate: {video_url}")
 
-            # Download video from URL with increased timeout
-            # Create a timeout object with long timeouts
-            timeout = aiohttp.ClientTimeout(total=1800, connect=60, sock_connect=60, sock_read=1800)
-            
-            # Use the timeout in the client session
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(video_url) as response:
-                    response.raise_for_status()
-                    with open(downloaded_path, 'wb') as f:
-                        async for chunk in response.content.iter_chunked(8192):
-                            f.write(chunk)
+            # Download video from URL over the service's keep-alive session
+            session = await self._get_http_session()
+            async with session.get(video_url) as response:
+                response.raise_for_status()
+                await self._save_response(response, downloaded_path)
 
             generation_time = time.time() - start_time
             logger.info(f"Successfully generated and saved video to {downloaded_path} in {generation_time:.2f} seconds")
@@ -4,6 +4,7 @@ import logging
 import base64
 from pathlib import Path
 import time
+from functools import lru_cache
 from typing import Tuple
 import aiohttp
 from PIL import Image
@@ -14,8 +15,38 @@ from src.services.video_service_base import BaseVideoService, VideoModel
 
 logger = logging.getLogger(__name__)
 
+# Task polling starts at this delay (seconds) and grows by POLL_BACKOFF up to the caller's poll_interval
+POLL_INITIAL_DELAY = 2.0
+POLL_BACKOFF = 1.5
+
+
+@lru_cache(maxsize=64)
+def _resize_and_encode_cached(image_path: str, mtime_ns: int, size: int, max_size: tuple) -> str:
+    """Resize an image and encode it as base64 JPEG.
+
+    mtime_ns and size are part of the cache key, so a regenerated frame is re-encoded.
+    """
+    with Image.open(image_path) as img:
+        # Convert to RGB if image is in RGBA mode
+        if img.mode == 'RGBA':
+            img = img.convert('RGB')
+
+        # Resize image while maintaining aspect ratio
+        img.thumbnail(max_size, Image.Resampling.LANCZOS)
+
+        # Save to bytes buffer; optimize=True would run a second Huffman pass for ~1% smaller output
+        buffer = io.BytesIO()
+        img.save(buffer, format='JPEG', quality=85)
+        buffer.seek(0)
+
+        # Convert to base64
+        return base64.b64encode(buffer.getvalue()).decode('utf-8')
+
 
 class RunwayMLVideoService(BaseVideoService):
+    # Runway's CDN serves short clips, so downloads are capped at 3 minutes
+    DOWNLOAD_TIMEOUT = aiohttp.ClientTimeout(total=180, connect=30, sock_connect=30, sock_read=180)
+
     def __init__(self, aws_service: AWSService):
         super().__init__(aws_service)
         logger.info("Initializing RunwayMLVideoService")
@@ -32,21 +63,8 @@ class RunwayMLVideoService(BaseVideoService):
         self.video_model = VideoModel(model_name="gen3a_turbo", parameters={})
     def _resize_and_encode_image(self, image_path: str, max_size: tuple = (1024, 1024)) -> str:
         """Resize image and encode to base64 with size optimization"""
-        with Image.open(image_path) as img:
-            # Convert to RGB if image is in RGBA mode
-            if img.mode == 'RGBA':
-                img = img.convert('RGB')
-            
-            # Resize image while maintaining aspect ratio
-            img.thumbnail(max_size, Image.Resampling.LANCZOS)
-            
-            # Save to bytes buffer with optimization
-            buffer = io.BytesIO()
-            img.save(buffer, format='JPEG', quality=85, optimize=True)
-            buffer.seek(0)
-            
-            # Convert to base64
-            return base64.b64encode(buffer.getvalue()).decode('utf-8')
+        stat = os.stat(image_path)
+        return _resize_and_encode_cached(str(image_path), stat.st_mtime_ns, stat.st_size, max_size)
     
     async def generate_video(
         self,
@@ -108,7 +126,8 @@ class RunwayMLVideoService(BaseVideoService):
             task_id = image_to_video.id
             logger.info(f"Video generation task created with ID: {task_id}")
 
-            # Poll until task completion
+            # Poll until task completion, starting fast and backing off up to poll_interval
+            delay = POLL_INITIAL_DELAY
             while True:
                 task = self.client.tasks.retrieve(task_id)
                 if task.status == "SUCCEEDED":
@@ -117,9 +136,10 @@ class RunwayMLVideoService(BaseVideoService):
                     raise Exception(f"Video generation task failed: {task}")
 
                 logger.debug(
-                    f"Task status: {task.status}, waiting {poll_interval} seconds..."
+                    f"Task status: {task.status}, waiting {delay:.1f} seconds..."
                 )
-                await asyncio.sleep(poll_interval)
+                await asyncio.sleep(delay)
+                delay = min(delay * POLL_BACKOFF, poll_interval)
 
             # Download the completed video
             save_path = self.get_download_path(video_path)
@@ -133,34 +153,33 @@ class RunwayMLVideoService(BaseVideoService):
                 raise Exception("No video URL found in task output")
             
             # Create timeout settings for 3 minutes
-            timeout = aiohttp.ClientTimeout(total=180, connect=30, sock_connect=30, sock_read=180)
-            
             logger.info(f"Downloading video from URL: {video_url} with 3-minute timeout")
-            # Use session with timeout settings and error handling
+            # Reuse the service's keep-alive session so each shot skips a fresh TCP+TLS handshake
+            session = await self._get_http_session()
+            download_start_time = time.time()
             try:
-                async with aiohttp.ClientSession(timeout=timeout) as session:
-                    try:
-                        logger.info(f"Starting video download...")
-                        download_start_time = time.time()
-                        async with session.get(video_url) as response:
-                            response.raise_for_status()
-                            logger.info(f"Response status: {response.status}, Content-Length: {response.headers.get('Content-Length', 'unknown')}")
-                            bytes_downloaded = 0
-                            with open(downloaded_path, "wb") as f:
-                                async for chunk in response.content.iter_chunked(8192):
-                                    bytes_downloaded += len(chunk)
-                                    f.write(chunk)
-                                    # Log download progress every 5MB
-                                    if bytes_downloaded % (5 * 1024 * 1024) < 8192:  
-                                        logger.info(f"Downloaded {bytes_downloaded / (1024 * 1024):.2f}MB in {time.time() - download_start_time:.2f} seconds")
-                            
-                            logger.info(f"Download completed: {bytes_downloaded / (1024 * 1024):.2f}MB in {time.time() - download_start_time:.2f} seconds")
-                    except aiohttp.ClientResponseError as e:
-                        logger.error(f"HTTP error during video download: {e.status} - {e.message}")
-                        raise Exception(f"Failed to download video: HTTP {e.status} - {e.message}")
-                    except aiohttp.ClientError as e:
-                        logger.error(f"Network error during video download: {str(e)}")
-                        raise Exception(f"Failed to download video: Network error - {str(e)}")
+                logger.info(f"Starting video download...")
+                async with session.get(video_url) as response:
+                    response.raise_for_status()
+                    logger.info(f"Response status: {response.status}, Content-Length: {response.headers.get('Content-Length', 'unknown')}")
+                    next_progress_log = 5 * 1024 * 1024
+
+                    def log_progress(bytes_downloaded: int):
+                        nonlocal next_progress_log
+                        # Log download progress every 5MB
+                        if bytes_downloaded >= next_progress_log:
+                            next_progress_log += 5 * 1024 * 1024
+                            logger.info(f"Downloaded {bytes_downloaded / (1024 * 1024):.2f}MB in {time.time() - download_start_time:.2f} seconds")
+
+                    bytes_downloaded = await self._save_response(response, downloaded_path, on_progress=log_progress)
+
+                    logger.info(f"Download completed: {bytes_downloaded / (1024 * 1024):.2f}MB in {time.time() - download_start_time:.2f} seconds")
+            except aiohttp.ClientResponseError as e:
+                logger.error(f"HTTP error during video download: {e.status} - {e.message}")
+                raise Exception(f"Failed to download video: HTTP {e.status} - {e.message}")
+            except aiohttp.ClientError as e:
+                logger.error(f"Network error during video download: {str(e)}")
+                raise Exception(f"Failed to download video: Network error - {str(e)}")
             except asyncio.TimeoutError:
                 logger.error(f"Timeout error during video download after {time.time() - download_start_time:.2f} seconds")
                 raise Exception("Video download timed out after 3 minutes - consider increasing the timeout further")
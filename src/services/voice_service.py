@@ -1,15 +1,25 @@
+import asyncio
 import os
 import logging
 import requests
-import mimetypes
+import time
+import threading
 import urllib3  # Import urllib3 directly
 from pyht import Client
 from dotenv import load_dotenv
 from pyht.client import TTSOptions
+from functools import lru_cache
 from typing import Optional, Dict, List, Tuple
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from pathlib import Path
+from pydantic import BaseModel
+
+try:
+    # Streams multipart uploads from disk instead of buffering the whole body
+    from requests_toolbelt.multipart.encoder import MultipartEncoder
+except ImportError:
+    MultipartEncoder = None
 
 # Disable warnings (use urllib3 directly)
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -19,6 +29,43 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+# How long (seconds) the account's cloned voice list is reused before it is fetched again
+VOICE_LIST_TTL = 300
+
+# Backoff delays (seconds) between checks that a newly cloned voice is ready.
+# The first check is immediate, so at most 3.75 s is spent waiting (less than the old fixed 5 s sleep)
+VOICE_READY_POLL_DELAYS = (0.25, 0.5, 1, 2)
+
+# How long (seconds) a resolved voice name -> id mapping is trusted without asking the API
+VOICE_ID_TTL = 3600
+
+# (connect, read) timeouts in seconds for PlayHT API calls; uploads get longer to send the sample
+API_TIMEOUT = (5, 60)
+UPLOAD_TIMEOUT = (10, 300)
+
+# Narration WAVs run to several MB, so audio chunks are coalesced into 1 MiB writes
+AUDIO_WRITE_BUFFER_SIZE = 1 << 20
+
+# MIME types for the voice sample formats PlayHT accepts; anything else is sent as WAV
+AUDIO_MIME_TYPES = {
+    ".wav": "audio/wav",
+    ".mp3": "audio/mpeg",
+    ".m4a": "audio/mp4",
+    ".aac": "audio/aac",
+    ".ogg": "audio/ogg",
+    ".flac": "audio/flac",
+}
+
+@lru_cache(maxsize=32)
+def _tts_options(voice_id: str) -> TTSOptions:
+    """Build the TTS options for a voice once and reuse them"""
+    return TTSOptions(voice=voice_id)
+
+class SceneNarration(BaseModel):
+    chapter_number: int
+    scene_number: int
+    text: str
+
 class VoiceService:
     _instance: Optional['VoiceService'] = None
     _initialized: bool = False
@@ -60,9 +107,28 @@ class VoiceService:
             backoff_factor=1,
             status_forcelist=[429, 500, 502, 503, 504],
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        # One pooled adapter for both schemes so every call reuses kept-alive connections
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=64,
+            max_retries=retry_strategy,
+            pool_block=False
+        )
         self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.session.headers.update(self.headers)
+        self.session.headers["Connection"] = "keep-alive"
+        # PlayHT client, created on first use and reused so each narration skips a new channel handshake
+        self._tts_client: Optional[Client] = None
+        # (fetched_at, voices) from the last list_cloned_voices call
+        self._voice_list_cache: Optional[Tuple[float, List[Dict]]] = None
+        # voice name -> (resolved_at, voice id), shared by narration calls running on worker threads
+        self._voice_id_cache: Dict[str, Tuple[float, str]] = {}
+        self._voice_id_lock = threading.Lock()
+        # voice name -> lock held while that voice is looked up or cloned
+        self._voice_name_locks: Dict[str, threading.Lock] = {}
+        # Scene directories already created, so repeat narrations skip the mkdir syscalls
+        self._created_dirs: set[str] = set()
         self._initialized = True
 
     @classmethod
@@ -74,26 +140,50 @@ class VoiceService:
             logger.info(f"Updated VoiceService temp_dir to: {temp_dir}")
         return instance
 
+    def _get_tts_client(self) -> Client:
+        """Get the shared PlayHT client, creating it on first use"""
+        if self._tts_client is None:
+            self._tts_client = Client(
+                user_id=self.user_id,
+                api_key=self.api_key,
+            )
+        return self._tts_client
+
+    def close(self):
+        """Close the PlayHT client and release the pooled HTTP connections"""
+        if self._tts_client is not None:
+            self._tts_client.close()
+            self._tts_client = None
+        self.session.close()
+
+    @classmethod
+    def close_instance(cls):
+        """Close the shared instance's connections if it was ever created"""
+        if cls._instance is not None and cls._instance._initialized:
+            cls._instance.close()
+
     def list_cloned_voices(self) -> List[Dict]:
         """List all cloned voices in the account."""
+        if self._voice_list_cache and time.monotonic() - self._voice_list_cache[0] < VOICE_LIST_TTL:
+            return self._voice_list_cache[1]
         try:
             response = self.session.get(
                 f"{self.api_url}/cloned-voices",
-                verify=self.verify_ssl
+                verify=self.verify_ssl,
+                timeout=API_TIMEOUT
             )
             response.raise_for_status()
-            return response.json()
+            voices = response.json()
+            self._voice_list_cache = (time.monotonic(), voices)
+            return voices
         except Exception as e:
             logger.error(f"Failed to list cloned voices: {str(e)}")
             raise
 
     def _get_mime_type(self, file_path: str) -> str:
         """Get the MIME type for a file based on its extension."""
-        mime_type, _ = mimetypes.guess_type(file_path)
-        if mime_type and mime_type.startswith('audio/'):
-            return mime_type
         # Default to audio/wav if we can't detect the type
-        return 'audio/wav'
+        return AUDIO_MIME_TYPES.get(os.path.splitext(file_path)[1].lower(), 'audio/wav')
 
     def clone_voice(self, voice_sample_path: str, voice_name: str) -> Dict:
         """Clone a voice from a sample audio file."""
@@ -106,60 +196,61 @@ class VoiceService:
             mime_type = self._get_mime_type(voice_sample_path)
             logger.debug(f"Detected MIME type: {mime_type}")
             
-            # Match the exact format from the working request sample
-            files = {
-                "sample_file": (
-                    os.path.basename(voice_sample_path),
-                    open(voice_sample_path, "rb"),
-                    mime_type
-                )
-            }
-            
             payload = {
                 "voice_name": voice_name
             }
             
-            headers = {
-                **self.headers,  # Base headers
-                "accept": "application/json"  # Ensure accept header is present
-            }
+            # Auth headers come from the pooled session; only the accept header is set per request
+            headers = {"accept": "application/json"}
             
             logger.debug(f"Sending request to {self.api_url}/cloned-voices/instant")
             
-            try:
-                response = requests.post(
+            # The with block closes the sample exactly once, including when the request raises
+            with open(voice_sample_path, "rb") as sample_file:
+                # Match the exact format from the working request sample
+                files = {
+                    "sample_file": (
+                        os.path.basename(voice_sample_path),
+                        sample_file,
+                        mime_type
+                    )
+                }
+
+                if MultipartEncoder is not None:
+                    # Stream the sample from disk instead of building the whole multipart body in memory
+                    encoder = MultipartEncoder(fields={**payload, **files})
+                    body = {"data": encoder, "headers": {**headers, "Content-Type": encoder.content_type}}
+                else:
+                    body = {"data": payload, "files": files, "headers": headers}
+
+                response = self.session.post(
                     f"{self.api_url}/cloned-voices/instant",
-                    data=payload,
-                    files=files,
-                    headers=headers,
-                    verify=self.verify_ssl
+                    verify=self.verify_ssl,
+                    timeout=UPLOAD_TIMEOUT,
+                    **body
                 )
-                
-                # Ensure we close the file after the request
-                files["sample_file"][1].close()
-                
-                try:
-                    response_json = response.json()
-                except ValueError:
-                    logger.error(f"Invalid JSON response: {response.text}")
-                    raise ValueError("API returned invalid JSON response")
-                
-                if response.status_code >= 400:
-                    error_message = response_json.get('error', {}).get('message', response.text)
-                    logger.error(f"API Error: {response.status_code} - {error_message}")
-                    raise requests.exceptions.HTTPError(
-                        f"API request failed: {error_message}",
-                        response=response
-                    )
-                
-                logger.info(f"Successfully cloned voice with name: {voice_name}")
-                return response_json
-
-            finally:
-                # Ensure file is closed even if request fails
-                if "sample_file" in files and hasattr(files["sample_file"][1], 'close'):
-                    files["sample_file"][1].close()
-                    
+            
+            if response.status_code >= 400:
+                error_message = self._error_message(response)
+                logger.error(f"API Error: {response.status_code} - {error_message}")
+                raise requests.exceptions.HTTPError(
+                    f"API request failed: {error_message}",
+                    response=response
+                )
+
+            try:
+                response_json = response.json()
+            except ValueError:
+                logger.error(f"Invalid JSON response: {self._body_preview(response)}")
+                raise ValueError("API returned invalid JSON response")
+            
+            logger.info(f"Successfully cloned voice with name: {voice_name}")
+            # The account's voice list changed, so the next lookup must refetch it
+            self._voice_list_cache = None
+            with self._voice_id_lock:
+                self._voice_id_cache.pop(voice_name, None)
+            return response_json
+
         except FileNotFoundError:
             logger.error(f"Voice sample file not found: {voice_sample_path}")
             raise
@@ -173,38 +264,80 @@ class VoiceService:
             logger.error(f"Unexpected error while cloning voice: {str(e)}")
             raise
 
+    def _error_message(self, response: requests.Response) -> str:
+        """Get the error message from a failed response, preferring the structured JSON error"""
+        # response.json() decodes the whole body through response.text, so only call it for JSON
+        if 'json' not in response.headers.get('Content-Type', '').lower():
+            return self._body_preview(response)
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        if isinstance(body, dict):
+            error = body.get('error')
+            message = (error.get('message') if isinstance(error, dict) else None) or body.get('message')
+            if message:
+                return str(message)
+        return self._body_preview(response)
+
+    def _body_preview(self, response: requests.Response) -> str:
+        """Decode only the start of a response body, e.g. a throttling HTML page"""
+        return response.content[:512].decode('utf-8', 'replace')
+
     def get_or_create_cloned_voice(self, voice_sample_path: str, voice_name: str) -> str:
         """Get existing cloned voice ID or create a new one."""
+        # Callers holding a PlayHT voice id already need no lookup
+        if voice_name.startswith('s3://'):
+            return voice_name
+
+        # Concurrent narrations of a project that has no voice yet would otherwise all miss
+        # the cache and each clone a duplicate voice; hold the name's lock through the clone
+        with self._voice_id_lock:
+            name_lock = self._voice_name_locks.setdefault(voice_name, threading.Lock())
+        with name_lock:
+            return self._get_or_create_cloned_voice(voice_sample_path, voice_name)
+
+    def _get_or_create_cloned_voice(self, voice_sample_path: str, voice_name: str) -> str:
+        """Resolve or clone the voice; the caller holds the voice name's lock"""
         try:
+            # Scenes of the same project resolve the same voice, so reuse a recent lookup
+            with self._voice_id_lock:
+                cached = self._voice_id_cache.get(voice_name)
+            if cached and time.monotonic() - cached[0] < VOICE_ID_TTL:
+                return cached[1]
+
             # First, check existing cloned voices
             logger.info(f"Checking for existing voice with name: {voice_name}")
             cloned_voices = self.list_cloned_voices()
-            
-            # Look for a voice with the same name
-            for voice in cloned_voices:
-                if voice.get('name') == voice_name and voice.get('id'):
-                    logger.info(f"Found existing voice with name '{voice_name}' and ID: {voice.get('id')}")
-                    voice_id = voice.get('id')
-                    if not voice_id:
-                        raise ValueError("Voice ID is not present in the response")
-                    return voice_id
+
+            # Remember every voice from the listing so other names also skip the request
+            resolved_at = time.monotonic()
+            with self._voice_id_lock:
+                for voice in cloned_voices:
+                    if voice.get('name') and voice.get('id'):
+                        self._voice_id_cache[voice['name']] = (resolved_at, voice['id'])
+                cached = self._voice_id_cache.get(voice_name)
+            if cached:
+                logger.info(f"Found existing voice with name '{voice_name}' and ID: {cached[1]}")
+                return cached[1]
             
             # If not found, create new cloned voice
             logger.info(f"No existing voice found with name '{voice_name}'. Creating new clone...")
             result = self.clone_voice(voice_sample_path, voice_name)
             
-            # Wait for a few seconds to ensure voice is ready
-            import time
-            time.sleep(5)
-            
             voice_id = result.get('id')
             if not voice_id:
                 raise ValueError("API response did not contain voice ID")
+
+            # Wait until the new voice is listed on the account, which usually happens right away
+            self._wait_for_voice_ready(voice_id)
             
             # Format the voice ID correctly
             if not voice_id.startswith('s3://'):
                 voice_id = f"s3://{voice_id}"
             
+            with self._voice_id_lock:
+                self._voice_id_cache[voice_name] = (time.monotonic(), voice_id)
             logger.info(f"Successfully created new cloned voice with ID: {voice_id}")
             return voice_id
             
@@ -212,6 +345,22 @@ class VoiceService:
             logger.error(f"Failed to get or create cloned voice: {str(e)}")
             raise
 
+    def _wait_for_voice_ready(self, voice_id: str):
+        """Poll the cloned voice list with backoff until the voice appears"""
+        wanted = {voice_id, voice_id[len('s3://'):] if voice_id.startswith('s3://') else f"s3://{voice_id}"}
+        for delay in (0, *VOICE_READY_POLL_DELAYS):
+            # Sleep only between checks, never after the last one
+            if delay:
+                time.sleep(delay)
+            # Always refetch; a cached listing can't show a voice that was just created
+            self._voice_list_cache = None
+            try:
+                if any(voice.get('id') in wanted for voice in self.list_cloned_voices()):
+                    return
+            except Exception as e:
+                logger.warning(f"Failed to check whether voice {voice_id} is ready: {str(e)}")
+        logger.warning(f"Voice {voice_id} was not listed after polling, using it anyway")
+
     async def generate_voice(self, text: str, voice_id: Optional[str] = None):
         """
         Generate voice audio using Play.HT service.
@@ -233,13 +382,7 @@ class VoiceService:
                     if not self.user_id or not self.api_key:
                         raise ValueError("PLAY_HT_USER_ID and PLAY_HT_API_KEY must be set in environment variables")
                     
-                    client = Client(
-                        user_id=self.user_id,
-                        api_key=self.api_key,
-                    )
-                    options = TTSOptions(voice=voice_id)
-                    
-                    return client.tts(text, options, voice_engine='PlayDialog')
+                    return self._get_tts_client().tts(text, _tts_options(voice_id), voice_engine='PlayDialog')
                 except Exception as e:
                     logger.error(f"Error using custom voice, falling back to default: {str(e)}")
                     voice_id = default_voice
@@ -248,19 +391,18 @@ class VoiceService:
             if not voice_id:
                 voice_id = default_voice
             
-            load_dotenv()
-            client = Client(
-                user_id=os.getenv("PLAY_HT_USER_ID",""),
-                api_key=os.getenv("PLAY_HT_API_KEY",""),
-            )
-            options = TTSOptions(voice=voice_id)
-            
-            return client.tts(text, options, voice_engine='PlayDialog')
+            return self._get_tts_client().tts(text, _tts_options(voice_id), voice_engine='PlayDialog')
 
         except Exception as e:
             logger.error(f"Failed to generate voice: {str(e)}")
             raise
 
+    def save_audio(self, audio_chunks, local_path: Path):
+        """Write streamed audio chunks to a file through a large write buffer"""
+        with open(local_path, "wb", buffering=AUDIO_WRITE_BUFFER_SIZE) as audio_file:
+            for chunk in audio_chunks:
+                audio_file.write(chunk)
+
     async def regenerate_narration(
         self,
         text: str,
@@ -284,38 +426,103 @@ class VoiceService:
         """
         try:
             # Generate audio path
-            audio_path = f"chapter_{chapter_number}/scene_{scene_number}/narration.wav"
-            local_path = temp_dir / audio_path
-            local_path.parent.mkdir(parents=True, exist_ok=True)
+            local_path = self._narration_path(temp_dir, chapter_number, scene_number)
+            self._ensure_dir(local_path.parent)
 
             # Get or create cloned voice
-            voice_sample_path = f"temp/{project_name}/voice_sample.m4a"
-            voice_id = None
-            if os.path.exists(voice_sample_path):
+            voice_id = await self.resolve_project_voice(project_name)
+
+            await self._narrate(text, voice_id, local_path)
+            return True, str(local_path)
+
+        except Exception as e:
+            logger.error(f"Error generating narration audio: {str(e)}")
+            return False, str(e)
+
+    async def regenerate_narrations(
+        self,
+        items: List[SceneNarration],
+        project_name: str,
+        temp_dir: Path,
+        max_concurrency: int = 8
+    ) -> List[Tuple[bool, str]]:
+        """
+        Generate narration audio for several scenes of a project concurrently.
+
+        The project voice is resolved once for the whole batch.
+
+        Returns:
+            List[Tuple[bool, str]]: (success, audio_file_path or error) per item, in order
+        """
+        voice_id = await self.resolve_project_voice(project_name)
+
+        local_paths = [
+            self._narration_path(temp_dir, item.chapter_number, item.scene_number)
+            for item in items
+        ]
+        for parent in {path.parent for path in local_paths}:
+            self._ensure_dir(parent)
+
+        # Stay well inside PlayHT's rate limits while keeping several streams in flight
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def narrate(item: SceneNarration, local_path: Path) -> Tuple[bool, str]:
+            async with semaphore:
                 try:
-                    voice_id = self.get_or_create_cloned_voice(
-                        voice_sample_path=voice_sample_path,
-                        voice_name=f"{project_name}"
-                    )
+                    await self._narrate(item.text, voice_id, local_path)
+                    return True, str(local_path)
                 except Exception as e:
-                    logger.error(f"Error creating cloned voice: {str(e)}")
+                    # One failed scene shouldn't cancel the rest of the batch
+                    logger.error(f"Error generating narration audio for chapter {item.chapter_number} scene {item.scene_number}: {str(e)}")
+                    return False, str(e)
 
-            # Generate audio
-            audio_chunks = await self.generate_voice(
-                text=text,
-                voice_id=voice_id
-            )
+        return await asyncio.gather(*(narrate(item, path) for item, path in zip(items, local_paths)))
 
-            # Write audio file
-            with open(local_path, "wb") as audio_file:
-                for chunk in audio_chunks:
-                    audio_file.write(chunk)
+    def _narration_path(self, temp_dir: Path, chapter_number: int, scene_number: int) -> Path:
+        """Get the local narration file path for a scene"""
+        return temp_dir / f"chapter_{chapter_number}/scene_{scene_number}/narration.wav"
 
-            return True, str(local_path)
+    def _ensure_dir(self, directory: Path):
+        """Create a directory unless this service already created it"""
+        key = str(directory)
+        if key not in self._created_dirs:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(key)
 
+    async def resolve_project_voice(self, project_name: str) -> Optional[str]:
+        """Get the project's cloned voice ID, or None to use the default voice"""
+        voice_sample_path = f"temp/{project_name}/voice_sample.m4a"
+        if not os.path.exists(voice_sample_path):
+            return None
+        try:
+            # The lookup/clone uses blocking requests calls, so run it on a worker thread
+            # to let narrations for other scenes proceed concurrently
+            return await asyncio.to_thread(
+                self.get_or_create_cloned_voice,
+                voice_sample_path=voice_sample_path,
+                voice_name=f"{project_name}"
+            )
         except Exception as e:
-            logger.error(f"Error generating narration audio: {str(e)}")
-            return False, str(e)
+            logger.error(f"Error creating cloned voice: {str(e)}")
+            return None
+
+    async def _narrate(self, text: str, voice_id: Optional[str], local_path: Path):
+        """Generate speech for text and write it to local_path"""
+        # Generate audio
+        audio_chunks = await self.generate_voice(
+            text=text,
+            voice_id=voice_id
+        )
+
+        # Write audio file. The chunks stream from PlayHT as they are consumed, so drain them
+        # on a worker thread to keep network and disk waits off the event loop
+        try:
+            await asyncio.to_thread(self.save_audio, audio_chunks, local_path)
+        except FileNotFoundError:
+            # The directory was removed since it was cached; open() failed before reading any chunk
+            self._created_dirs.discard(str(local_path.parent))
+            self._ensure_dir(local_path.parent)
+            await asyncio.to_thread(self.save_audio, audio_chunks, local_path)
 
     async def update_narration(
         self,
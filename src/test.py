@@ -1,18 +1,20 @@
-from pyht import Client
-from dotenv import load_dotenv
-from pyht.client import TTSOptions
-import os
-load_dotenv()
+import asyncio
+from src.services.voice_service import VoiceService
 
-client = Client(
-    user_id=os.getenv("PLAY_HT_USER_ID",""),
-    api_key=os.getenv("PLAY_HT_API_KEY",""),
-)
-options = TTSOptions(voice="s3://voice-cloning-zero-shot/775ae416-49bb-4fb6-bd45-740f205d20a1/jennifersaad/manifest.json")
-# Open a file to save the audio
-with open("output_jenn.wav", "wb") as audio_file:
-    for chunk in client.tts("Hi, I'm Jennifer from Play. How can I help you today?", options, voice_engine = 'PlayDialog'):
-        # Write the audio chunk to the file
-        audio_file.write(chunk)
+VOICE_ID = "s3://voice-cloning-zero-shot/775ae416-49bb-4fb6-bd45-740f205d20a1/jennifersaad/manifest.json"
 
-print("Audio saved as output_jenn.wav")
\ No newline at end of file
+async def main():
+    # Go through VoiceService so this exercises the same client and write path as the API
+    voice_service = VoiceService.get_instance()
+    audio_chunks = await voice_service.generate_voice(
+        "Hi, I'm Jennifer from Play. How can I help you today?",
+        voice_id=VOICE_ID
+    )
+    # Save the audio to a file
+    voice_service.save_audio(audio_chunks, "output_jenn.wav")
+    voice_service.close()
+
+    print("Audio saved as output_jenn.wav")
+
+if __name__ == "__main__":
+    asyncio.run(main())
\ No newline at end of file
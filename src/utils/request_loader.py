@@ -1,6 +1,21 @@
+import copy
+from functools import lru_cache
+import os
 from models.models import ProjectDetails
 import yaml
 
+try:
+    # libyaml's C loader parses the same documents several times faster
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+@lru_cache(maxsize=64)
+def _load_yaml(yaml_file: str, mtime_ns: int) -> dict:
+    """Parse a YAML file; keyed on its mtime so an edited file is parsed again"""
+    with open(yaml_file, 'r') as f:
+        return yaml.load(f.read(), Loader=SafeLoader)
+
 def read_video_request(yaml_file: str) -> ProjectDetails:
     """
     Read and parse a video request from a YAML file into a ProjectDetails object.
@@ -11,6 +26,6 @@ def read_video_request(yaml_file: str) -> ProjectDetails:
     Returns:
         ProjectDetails: Parsed video request object
     """
-    with open(yaml_file, 'r') as f:
-        yaml_data = yaml.safe_load(f)
+    # Copy the cached document so a caller mutating its request can't change later loads
+    yaml_data = copy.deepcopy(_load_yaml(yaml_file, os.stat(yaml_file).st_mtime_ns))
     return ProjectDetails(**yaml_data)
\ No newline at end of file